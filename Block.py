@@ -1,5 +1,6 @@
 import hashlib
-import json
+from BlockHeader import BlockHeader
+from Transaction import Transaction
 
 class Block:
     def __init__(self, index, timestamp, transactions, previous_hash, nonce=0):
@@ -11,30 +12,83 @@ class Block:
         self.merkle_root = self.calculate_merkle_root() if transactions else ""
         self.hash = self.calculate_hash()
 
+    @staticmethod
+    def _hash_pair(left, right):
+        return hashlib.sha256((left + right).encode()).hexdigest()
+
+    def _merkle_levels(self):
+        """머클 트리의 각 층 (잎부터 루트까지). 홀수 개인 층은 마지막 노드를 복제해 짝을 맞춤."""
+        level = [tx.calculate_merkle_leaf() for tx in self.transactions]
+        levels = [level]
+        while len(level) > 1:
+            if len(level) % 2 == 1:
+                level = level + [level[-1]]
+            level = [Block._hash_pair(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+            levels.append(level)
+        return levels
+
     def calculate_merkle_root(self):
-        """간단한 머클 루트 계산 (트랜잭션 ID들을 해싱)"""
+        """머클 루트 계산 (트랜잭션 잎 해시를 두 개씩 짝지어 재귀적으로 해싱)"""
         if not self.transactions:
             return ""
-        transaction_ids = [tx.transaction_id for tx in self.transactions]
-        if not transaction_ids:
-            return ""
+        return self._merkle_levels()[-1][0]
 
-        # 실제 머클 트리는 재귀적으로 두 개씩 짝지어 해싱
-        # 여기서는 단순화를 위해 모든 ID를 합쳐서 한 번 해싱
-        combined_ids = "".join(sorted(transaction_ids))
-        return hashlib.sha256(combined_ids.encode()).hexdigest()
+    def get_merkle_proof(self, transaction_id):
+        """
+        트랜잭션의 머클 포함 증명을 반환합니다: [(형제 해시, 형제가 왼쪽인지), ...] (잎에서 루트 방향).
+        블록에 없는 트랜잭션이면 None.
+        """
+        position = next((i for i, tx in enumerate(self.transactions) if tx.transaction_id == transaction_id), None)
+        if position is None:
+            return None
+        proof = []
+        for level in self._merkle_levels()[:-1]:
+            if len(level) % 2 == 1:
+                level = level + [level[-1]]
+            sibling = position ^ 1
+            proof.append((level[sibling], sibling < position))
+            position //= 2
+        return proof
 
+    @staticmethod
+    def verify_merkle_proof(leaf_hash, proof, merkle_root):
+        """잎 해시와 증명으로 계산한 루트가 merkle_root와 같은지 확인합니다."""
+        current = leaf_hash
+        for sibling_hash, sibling_is_left in proof:
+            current = Block._hash_pair(sibling_hash, current) if sibling_is_left else Block._hash_pair(current, sibling_hash)
+        return current == merkle_root
 
     def calculate_hash(self):
-        block_header_data = {
+        return BlockHeader.compute_hash(self.index, self.timestamp, self.previous_hash, self.merkle_root, self.nonce)
+
+    def get_header(self):
+        """트랜잭션 본문을 뺀 헤더만 반환합니다."""
+        return BlockHeader(self.index, self.timestamp, self.previous_hash, self.merkle_root, self.nonce, self.hash)
+
+    def to_dict(self):
+        return {
             "index": self.index,
             "timestamp": self.timestamp,
             "previous_hash": self.previous_hash,
+            "nonce": self.nonce,
             "merkle_root": self.merkle_root,
-            "nonce": self.nonce
+            "hash": self.hash,
+            "transactions": [tx.to_dict() for tx in self.transactions],
         }
-        block_header_string = json.dumps(block_header_data, sort_keys=True).encode()
-        return hashlib.sha256(block_header_string).hexdigest()
+
+    @classmethod
+    def from_dict(cls, data):
+        """to_dict 결과로부터 블록을 복원합니다. 해시/머클루트는 저장된 값을 사용 (검증은 호출자가 수행)."""
+        block = cls(
+            index=data["index"],
+            timestamp=data["timestamp"],
+            transactions=[Transaction.from_dict(tx) for tx in data["transactions"]],
+            previous_hash=data["previous_hash"],
+            nonce=data["nonce"]
+        )
+        block.merkle_root = data["merkle_root"]
+        block.hash = data["hash"]
+        return block
 
     def __repr__(self):
         return (f"Block(Index: {self.index}, Hash: {self.hash[:10]}..., "
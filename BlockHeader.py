@@ -0,0 +1,36 @@
+import hashlib
+import json
+
+class BlockHeader:
+    """트랜잭션 본문 없이 블록 헤더만 담는 객체 (라이트 노드, 가지치기된 블록용)."""
+    __slots__ = ("index", "timestamp", "previous_hash", "merkle_root", "nonce", "hash")
+
+    def __init__(self, index, timestamp, previous_hash, merkle_root, nonce, block_hash):
+        self.index = index
+        self.timestamp = timestamp
+        self.previous_hash = previous_hash
+        self.merkle_root = merkle_root
+        self.nonce = nonce
+        self.hash = block_hash
+
+    @staticmethod
+    def compute_hash(index, timestamp, previous_hash, merkle_root, nonce):
+        """헤더 필드로 블록 해시를 계산합니다 (Block.calculate_hash와 동일한 방식)."""
+        block_header_data = {
+            "index": index,
+            "timestamp": timestamp,
+            "previous_hash": previous_hash,
+            "merkle_root": merkle_root,
+            "nonce": nonce
+        }
+        block_header_string = json.dumps(block_header_data, sort_keys=True).encode()
+        return hashlib.sha256(block_header_string).hexdigest()
+
+    def calculate_hash(self):
+        return BlockHeader.compute_hash(self.index, self.timestamp, self.previous_hash, self.merkle_root, self.nonce)
+
+    def get_header(self):
+        return self
+
+    def __repr__(self):
+        return f"BlockHeader(Index: {self.index}, Hash: {self.hash[:10]}...)"
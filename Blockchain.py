@@ -2,17 +2,25 @@ import time
 import json
 import hashlib
 from Block import Block
+from BlockHeader import BlockHeader
 from Transaction import Transaction
 from TransactionInput import TransactionInput
 from TransactionOutput import TransactionOutput
+from UTXOView import UTXOView
+from ChainIndex import ChainIndex
 from const import INITIAL_DIFFICULTY, MINING_REWARD
 
 class Blockchain:
-    def __init__(self, node_id, difficulty=INITIAL_DIFFICULTY):
+    def __init__(self, node_id, difficulty=INITIAL_DIFFICULTY, enable_index=False, prune_depth=None):
+        if prune_depth is not None and prune_depth < 1:
+            raise ValueError(f"prune_depth는 1 이상이어야 합니다: {prune_depth}")
         self.node_id = node_id # 이 블록체인 인스턴스를 소유한 노드 ID (P2P 시뮬레이션용)
-        self.chain = []
+        self.chain = [] # Block 객체의 리스트 (가지치기된 블록은 BlockHeader)
         self.UTXOs = {} # UTXO 풀: {utxo_id: TransactionOutput 객체}
         self.difficulty = difficulty
+        self.chain_index = ChainIndex() if enable_index else None # 블록/트랜잭션/주소 조회 인덱스 (선택적)
+        self.prune_depth = prune_depth # 팁에서 이 깊이보다 오래된 블록은 트랜잭션 본문을 버리고 헤더만 유지 (None이면 가지치기 안 함)
+        self.pruned_height = 0 # 이 높이까지의 블록은 본문이 없음 (제네시스는 원래 본문이 없음)
         self.create_genesis_block()
 
     def create_genesis_block(self):
@@ -20,6 +28,8 @@ class Blockchain:
         # 여기서는 간단히 빈 트랜잭션으로 시작
         genesis_block = Block(0, time.time(), [], "0")
         self.chain.append(genesis_block)
+        if self.chain_index is not None:
+            self.chain_index.add_block(genesis_block, 0)
         print(f"Node {self.node_id}: 제네시스 블록 생성됨: {genesis_block.hash[:10]}...")
 
     def get_last_block(self):
@@ -98,11 +108,38 @@ class Blockchain:
             return None
 
 
-    def add_block(self, new_block):
-        """새로운 블록을 체인에 추가하고 UTXO를 업데이트합니다."""
+    def add_block(self, new_block, verified_positions=None):
+        """
+        새로운 블록을 체인에 추가하고 UTXO를 업데이트합니다.
+        verified_positions는 서명을 미리 검증한 트랜잭션의 블록 내 위치 집합입니다
+        (예: 파일 가져오기 파이프라인). 그 밖의 트랜잭션은 여기서 서명을 검증합니다.
+        """
+        if self.is_pruned(new_block):
+            print(f"Node {self.node_id}: 오류 - 블록 #{new_block.index}의 트랜잭션 본문이 없어 검증할 수 없음.")
+            return False
         last_block = self.get_last_block()
+        if not self.is_block_header_valid(new_block, last_block):
+            return False
+
+        # 블록 내 트랜잭션 유효성 검사는 UTXO 풀 위의 오버레이 뷰에서 수행 (실패 시 뷰만 버림)
+        utxo_view = UTXOView(self.UTXOs)
+        if not self.connect_block_transactions(new_block, utxo_view, verified_positions):
+            return False
+
+        # 모든 검증 통과 시 체인에 블록 추가 및 UTXO 풀 업데이트 (변경분만 반영)
+        self.chain.append(new_block)
+        utxo_view.commit()
+        if self.chain_index is not None:
+            self.chain_index.add_block(new_block, len(self.chain) - 1)
+        self.prune_blocks()
+
+        print(f"Node {self.node_id}: 블록 #{new_block.index} 체인에 성공적으로 추가됨. UTXO 풀 업데이트됨.")
+        return True
+
+    def is_block_header_valid(self, new_block, previous_block):
+        """블록 헤더(이전 해시 연결, 해시 재계산, PoW)를 검사합니다."""
         # 기본적인 유효성 검사
-        if new_block.previous_hash != last_block.hash:
+        if new_block.previous_hash != previous_block.hash:
             print(f"Node {self.node_id}: 오류 - 이전 블록 해시 불일치.")
             return False
 
@@ -124,50 +161,44 @@ class Blockchain:
         if not new_block.hash.startswith('0' * self.difficulty):
             print(f"Node {self.node_id}: 오류 - 작업 증명(PoW)이 유효하지 않습니다.")
             return False
+        return True
 
-        # 블록 내 트랜잭션 유효성 검사 및 UTXO 업데이트
-        temp_utxos_to_add = {}
-        temp_utxos_to_remove_ids = set()
-
-        for tx in new_block.transactions:
+    def connect_block_transactions(self, block, utxo_view, verified_positions=None):
+        """
+        블록의 트랜잭션들을 검증하며 utxo_view에 적용합니다.
+        verified_positions에 든 위치의 트랜잭션은 서명 검증을 건너뜁니다 (이미 검증됨).
+        실패하면 False를 반환하며, 이때 utxo_view는 일부만 반영된 상태이므로 버려야 합니다.
+        """
+        # 헤더의 머클 루트가 실제 트랜잭션들과 일치해야 함 (라이트 노드의 포함 증명이 이 루트에 의존)
+        if block.merkle_root != block.calculate_merkle_root():
+            print(f"Node {self.node_id}: 블록 #{block.index}의 머클 루트가 트랜잭션과 일치하지 않음. 블록 거부.")
+            return False
+        for position, tx in enumerate(block.transactions):
             # 코인베이스 트랜잭션 처리
-            if not tx.inputs and tx.outputs[0].amount == MINING_REWARD and tx.transaction_id.startswith("coinbase"):
+            if tx.is_coinbase():
                 out = tx.outputs[0]
-                temp_utxos_to_add[out.id] = out
+                utxo_view.add(out.id, out)
                 continue # 다음 트랜잭션으로
 
             # 일반 트랜잭션 유효성 검사
-            if not tx.is_signature_valid():
+            already_verified = verified_positions is not None and position in verified_positions
+            if not already_verified and not tx.is_signature_valid():
                 print(f"Node {self.node_id}: 블록 내 트랜잭션 {tx.transaction_id[:10]} 서명 검증 실패. 블록 거부.")
                 return False
 
-            # 입력 UTXO가 현재 UTXO 풀에 있는지 확인 (또는 이 블록 내 이전 트랜잭션에서 생성된 것인지)
+            # 입력 UTXO가 뷰에 있는지 확인 (이 블록 내 이전 트랜잭션에서 생성된 것도 뷰에 포함됨)
             current_inputs_value = 0
             for tx_input in tx.inputs:
-                if tx_input.transaction_output_id not in self.UTXOs and tx_input.transaction_output_id not in temp_utxos_to_add:
-                    # 블록 내 다른 트랜잭션의 출력인지 확인 (한 블록 내에서 체인처럼 소비될 수 있음)
-                    found_in_block = False
-                    for prev_tx_in_block in new_block.transactions:
-                        if prev_tx_in_block == tx: break # 자기 자신 이전까지만
-                        for prev_out in prev_tx_in_block.outputs:
-                            if prev_out.id == tx_input.transaction_output_id:
-                                current_inputs_value += prev_out.amount
-                                temp_utxos_to_remove_ids.add(prev_out.id) # 블록 내에서 사용됨
-                                found_in_block = True
-                                break
-                        if found_in_block: break
-                    if not found_in_block:
-                        print(f"Node {self.node_id}: 블록 내 트랜잭션 {tx.transaction_id[:10]}의 입력 UTXO {tx_input.transaction_output_id[:10]}를 찾을 수 없음. 블록 거부.")
-                        return False
-                elif tx_input.transaction_output_id in self.UTXOs:
-                    current_inputs_value += self.UTXOs[tx_input.transaction_output_id].amount
-                    temp_utxos_to_remove_ids.add(tx_input.transaction_output_id) # 사용될 UTXO
-                elif tx_input.transaction_output_id in temp_utxos_to_add: # 이미 이 블록에서 추가될 예정인 UTXO
-                     current_inputs_value += temp_utxos_to_add[tx_input.transaction_output_id].amount
-                     # temp_utxos_to_add에서 제거하고, remove_ids에도 추가 (소비되므로)
-                     del temp_utxos_to_add[tx_input.transaction_output_id]
-                     temp_utxos_to_remove_ids.add(tx_input.transaction_output_id)
-
+                utxo = utxo_view.get(tx_input.transaction_output_id)
+                if utxo is None:
+                    print(f"Node {self.node_id}: 블록 내 트랜잭션 {tx.transaction_id[:10]}의 입력 UTXO {tx_input.transaction_output_id[:10]}를 찾을 수 없음. 블록 거부.")
+                    return False
+                # 입력이 들고 있는 UTXO 정보가 실제 UTXO와 같아야 함 (블록 되돌리기 시 이 정보로 복원)
+                if tx_input.UTXO.amount != utxo.amount or tx_input.UTXO.recipient_address != utxo.recipient_address:
+                    print(f"Node {self.node_id}: 트랜잭션 {tx.transaction_id[:10]}의 입력 {tx_input.transaction_output_id[:10]} 정보가 UTXO와 다름. 블록 거부.")
+                    return False
+                current_inputs_value += utxo.amount
+                utxo_view.spend(tx_input.transaction_output_id) # 사용될 UTXO
 
             # 금액 확인 (입력 총합 >= 출력 총합)
             total_output_value = sum(out.amount for out in tx.outputs)
@@ -175,24 +206,150 @@ class Blockchain:
                 print(f"Node {self.node_id}: 트랜잭션 {tx.transaction_id[:10]} 입력({current_inputs_value}) < 출력({total_output_value}). 블록 거부.")
                 return False
 
-            # 새로운 출력 UTXO를 임시 추가 목록에 넣음
+            # 새로운 출력 UTXO를 뷰에 추가
             for out in tx.outputs:
-                if out.id in temp_utxos_to_add or out.id in self.UTXOs: # 이미 존재하는 UTXO ID면 문제
+                if out.id in utxo_view: # 이미 존재하는 UTXO ID면 문제
                     print(f"Node {self.node_id}: 중복된 UTXO ID {out.id[:10]} 생성 시도. 블록 거부.")
                     return False
-                temp_utxos_to_add[out.id] = out
+                utxo_view.add(out.id, out)
+        return True
 
+    def disconnect_block_transactions(self, block, utxo_view):
+        """블록의 트랜잭션 효과를 utxo_view에서 되돌립니다 (생성된 출력 제거, 소비된 입력 복원)."""
+        for tx in reversed(block.transactions):
+            for out in tx.outputs:
+                utxo_view.spend(out.id)
+            for tx_input in tx.inputs:
+                utxo_view.add(tx_input.transaction_output_id, tx_input.UTXO)
 
-        # 모든 검증 통과 시 체인에 블록 추가 및 UTXO 풀 업데이트
-        self.chain.append(new_block)
-        for utxo_id in temp_utxos_to_remove_ids:
-            if utxo_id in self.UTXOs:
-                del self.UTXOs[utxo_id]
-            # temp_utxos_to_add 에서도 제거될 수 있으나, 위 로직에서 이미 처리됨
-        self.UTXOs.update(temp_utxos_to_add)
+    def find_fork_point(self, other_chain):
+        """두 체인이 공유하는 마지막 블록의 높이를 반환합니다 (공유 블록이 없으면 -1)."""
+        height = min(len(self.chain), len(other_chain)) - 1
+        while height >= 0 and self.chain[height].hash != other_chain[height].hash:
+            height -= 1
+        return height
 
-        print(f"Node {self.node_id}: 블록 #{new_block.index} 체인에 성공적으로 추가됨. UTXO 풀 업데이트됨.")
-        return True
+    def evaluate_fork(self, candidate_chain):
+        """
+        후보 체인으로 교체할 경우의 체인과 UTXO 상태를 계산합니다.
+        공통 조상까지는 현재 UTXO 풀을 그대로 쓰고, 오버레이 뷰에서 분기 이후의 자기 블록만 되돌린 뒤
+        후보 블록을 연결하므로 비용은 전체 UTXO 수가 아니라 분기 이후 블록 수에 비례합니다.
+        유효하면 (새 체인, UTXO 뷰), 아니면 (None, None)을 반환합니다.
+        """
+        fork_height = self.find_fork_point(candidate_chain)
+        if fork_height < 0:
+            # 공통 조상 없음 (제네시스가 다름): 빈 UTXO 풀에서 후보 체인 전체를 재구성
+            # 제네시스 블록은 UTXO 변경 없이 그대로 사용
+            utxo_view = UTXOView({})
+            new_chain = [candidate_chain[0]]
+        else:
+            utxo_view = UTXOView(self.UTXOs)
+            for block in reversed(self.chain[fork_height + 1:]):
+                if self.is_pruned(block):
+                    print(f"Node {self.node_id}: 가지치기된 블록 #{block.index}는 되돌릴 수 없어 후보 체인을 거부합니다.")
+                    return None, None
+                self.disconnect_block_transactions(block, utxo_view)
+            new_chain = self.chain[:fork_height + 1]
+
+        for block in candidate_chain[len(new_chain):]:
+            if self.is_pruned(block):
+                print(f"Node {self.node_id}: 후보 체인의 블록 #{block.index}는 트랜잭션 본문이 없어 검증할 수 없음.")
+                return None, None
+            if not self.is_block_header_valid(block, new_chain[-1]) or not self.connect_block_transactions(block, utxo_view):
+                print(f"Node {self.node_id}: 후보 체인 검증 중 블록 {block.index} 유효성 실패.")
+                return None, None
+            new_chain.append(block)
+        return new_chain, utxo_view
+
+    def replace_chain(self, new_chain, utxo_view):
+        """evaluate_fork 결과로 체인과 UTXO 풀을 교체합니다."""
+        fork_height = self.find_fork_point(new_chain)
+        if self.chain_index is not None:
+            # 분기 이후의 기존 블록을 인덱스에서 해제하고 새 블록을 연결
+            for block in reversed(self.chain[fork_height + 1:]):
+                self.chain_index.remove_block(block)
+            for height in range(fork_height + 1, len(new_chain)):
+                self.chain_index.add_block(new_chain[height], height)
+        utxo_view.commit() # 기존 UTXO 풀(또는 새로 재구성한 풀)에 변경분 반영
+        self.chain = new_chain
+        self.UTXOs = utxo_view.base
+        # 공통 조상이 없던 경우 새 체인은 처음부터 본문이 있으므로 가지치기 높이를 되돌림
+        self.pruned_height = min(self.pruned_height, max(fork_height, 0))
+        self.prune_blocks()
+
+    @staticmethod
+    def is_pruned(block):
+        """트랜잭션 본문이 제거되어 헤더만 남은 블록인지 여부."""
+        return isinstance(block, BlockHeader)
+
+    def prune_blocks(self):
+        """
+        보존 깊이(prune_depth)보다 오래된 블록의 트랜잭션 본문을 버리고 헤더만 남깁니다.
+        새 블록 검증에는 UTXO 풀만 필요하므로, 메모리는 전체 기록이 아니라
+        UTXO 풀 + 보존 구간 블록 + 헤더에 비례합니다. 제거한 블록 수를 반환합니다.
+        """
+        if self.prune_depth is None:
+            return 0
+        prune_up_to = len(self.chain) - 1 - self.prune_depth
+        pruned_count = 0
+        for height in range(self.pruned_height + 1, prune_up_to + 1):
+            block = self.chain[height]
+            if self.is_pruned(block):
+                continue
+            if self.chain_index is not None:
+                self.chain_index.prune_block(block)
+            self.chain[height] = block.get_header()
+            pruned_count += 1
+        self.pruned_height = max(self.pruned_height, prune_up_to)
+        return pruned_count
+
+    def reset_chain(self, genesis_block):
+        """체인을 주어진 제네시스 블록 하나로 초기화하고 UTXO 풀을 비웁니다."""
+        self.load_chain([genesis_block], {})
+
+    def load_chain(self, chain, utxos, pruned_height=0):
+        """다른 곳에서 검증을 마친 체인과 UTXO 풀로 상태를 통째로 교체합니다 (파일 부트스트랩 등)."""
+        self.chain = chain
+        self.UTXOs.clear() # 같은 dict 객체를 유지 (멤풀 뷰 등이 참조)
+        self.UTXOs.update(utxos)
+        self.pruned_height = pruned_height
+        if self.chain_index is not None:
+            self.chain_index.rebuild(self.chain)
+
+    def get_block_by_hash(self, block_hash):
+        """해시로 블록을 찾습니다 (인덱스가 없으면 체인을 순회). 가지치기된 블록은 BlockHeader. 없으면 None."""
+        if self.chain_index is not None:
+            height = self.chain_index.get_block_height(block_hash)
+            return self.chain[height] if height is not None else None
+        for block in self.chain:
+            if block.hash == block_hash:
+                return block
+        return None
+
+    def get_transaction(self, tx_id):
+        """트랜잭션 ID로 (블록, 트랜잭션)을 찾습니다 (인덱스가 없으면 체인을 순회). 없거나 가지치기되었으면 None."""
+        if self.chain_index is not None:
+            location = self.chain_index.get_transaction_location(tx_id)
+            if location is None:
+                return None
+            block = self.chain[location[0]]
+            return block, block.transactions[location[1]]
+        for block in self.chain[self.pruned_height + 1:]:
+            for tx in block.transactions:
+                if tx.transaction_id == tx_id:
+                    return block, tx
+        return None
+
+    def get_address_history(self, address):
+        """주소와 관련된 (송신 또는 수신) 트랜잭션 ID 목록을 체인 순서대로 반환합니다 (가지치기된 블록 제외)."""
+        if self.chain_index is not None:
+            return self.chain_index.get_address_history(address)
+        history = []
+        for block in self.chain[self.pruned_height + 1:]:
+            for tx in block.transactions:
+                if tx.sender_address == address or any(out.recipient_address == address for out in tx.outputs):
+                    history.append(tx.transaction_id)
+        return history
 
 
     def get_balance(self, address):
@@ -234,11 +391,13 @@ class Blockchain:
             if not current_block.hash.startswith('0' * self.difficulty): # PoW 검증
                 print(f"유효성 오류: 블록 {current_block.index}의 작업 증명이 유효하지 않음.")
                 return False
+            if self.is_pruned(current_block): # 본문이 없는 블록은 헤더만 검사
+                continue
 
             # 트랜잭션 유효성 검사 (여기서는 단순화. 실제로는 UTXO 상태를 재구성하며 검증해야 함)
             # 이 함수는 주로 체인 구조와 PoW만 검사하는 것으로 가정
             for tx in current_block.transactions:
-                if not tx.transaction_id.startswith("coinbase_") and not tx.is_signature_valid():
+                if not tx.is_coinbase() and not tx.is_signature_valid():
                      print(f"유효성 오류: 블록 {current_block.index} 내 트랜잭션 {tx.transaction_id[:10]} 서명 무효.")
                      return False
         print(f"Node {self.node_id}: 체인 유효성 검사 통과.")
@@ -0,0 +1,87 @@
+from BlockHeader import BlockHeader
+
+
+class ChainIndex:
+    """
+    블록체인 조회용 인덱스 (선택적).
+    - 블록 해시 -> 높이
+    - 트랜잭션 ID -> (블록 높이, 블록 내 위치)
+    - 주소 -> 관련 트랜잭션 ID 목록 (체인 순서)
+    블록이 체인 끝에 연결/해제될 때마다 갱신되므로 조회가 체인 전체 순회 없이 O(1)입니다.
+    가지치기된(헤더만 남은) 블록은 블록 해시 -> 높이 항목만 유지합니다.
+    """
+    def __init__(self):
+        self.block_heights = {} # {block_hash: height}
+        self.tx_locations = {} # {tx_id: (height, position)}
+        self.address_history = {} # {address: [tx_id, ...]}
+
+    @staticmethod
+    def _addresses_of(tx):
+        """트랜잭션과 관련된 주소들 (송신자 + 출력 수신자)."""
+        addresses = [tx.sender_address]
+        for out in tx.outputs:
+            if out.recipient_address not in addresses:
+                addresses.append(out.recipient_address)
+        return addresses
+
+    def add_block(self, block, height):
+        """체인 끝(height)에 연결된 블록을 인덱스에 추가합니다."""
+        self.block_heights[block.hash] = height
+        if isinstance(block, BlockHeader): # 본문 없음
+            return
+        for position, tx in enumerate(block.transactions):
+            self.tx_locations[tx.transaction_id] = (height, position)
+            for address in self._addresses_of(tx):
+                self.address_history.setdefault(address, []).append(tx.transaction_id)
+
+    def remove_block(self, block):
+        """체인 끝에서 해제된 블록을 인덱스에서 제거합니다."""
+        self.block_heights.pop(block.hash, None)
+        if isinstance(block, BlockHeader): # 본문 없음
+            return
+        for tx in reversed(block.transactions):
+            self.tx_locations.pop(tx.transaction_id, None)
+            for address in self._addresses_of(tx):
+                self._remove_from_history(address, tx.transaction_id)
+
+    def prune_block(self, block):
+        """본문이 제거될 블록의 트랜잭션/주소 항목을 지웁니다 (블록 해시 -> 높이는 유지)."""
+        for tx in block.transactions:
+            self.tx_locations.pop(tx.transaction_id, None)
+            for address in self._addresses_of(tx):
+                self._remove_from_history(address, tx.transaction_id)
+
+    def _remove_from_history(self, address, tx_id):
+        history = self.address_history.get(address)
+        if not history:
+            return
+        # 해제는 체인 끝, 가지치기는 가장 오래된 블록부터이므로 대부분 목록의 마지막/첫 항목
+        if history[-1] == tx_id:
+            history.pop()
+        elif history[0] == tx_id:
+            history.pop(0)
+        elif tx_id in history:
+            history.remove(tx_id)
+        if not history:
+            del self.address_history[address]
+
+    def rebuild(self, chain):
+        """체인 전체로부터 인덱스를 다시 만듭니다."""
+        self.block_heights = {}
+        self.tx_locations = {}
+        self.address_history = {}
+        for height, block in enumerate(chain):
+            self.add_block(block, height)
+
+    def get_block_height(self, block_hash):
+        return self.block_heights.get(block_hash)
+
+    def get_transaction_location(self, tx_id):
+        return self.tx_locations.get(tx_id)
+
+    def get_address_history(self, address):
+        return list(self.address_history.get(address, []))
+
+    def __repr__(self):
+        return (f"ChainIndex(Blocks: {len(self.block_heights)}, Transactions: {len(self.tx_locations)}, "
+                f"Addresses: {len(self.address_history)})")
@@ -0,0 +1,126 @@
+from Block import Block
+from Wallet import Wallet
+from const import INITIAL_DIFFICULTY
+
+
+class LightNode:
+    """
+    헤더만 저장하는 라이트 노드 (SPV).
+    블록 헤더의 PoW와 연결만 검증하고, 자신의 주소로의 지급은 풀 노드가 제공하는
+    머클 포함 증명으로 확인합니다. 트랜잭션 본문과 UTXO 풀은 저장하지 않으므로
+    메모리는 블록당 헤더 하나만큼만 늘어납니다.
+    주의: 포함 여부만 증명되며, 해당 출력이 이후에 소비되었는지는 알 수 없습니다.
+    """
+    def __init__(self, node_id, difficulty=INITIAL_DIFFICULTY):
+        self.node_id = node_id
+        self.wallet = Wallet()
+        self.difficulty = difficulty
+        self.headers = [] # BlockHeader 객체의 리스트 (높이 순)
+        self.header_heights = {} # {block_hash: height}
+        self.full_nodes = [] # 헤더와 증명을 요청할 풀 노드(NetworkNode)들
+        print(f"라이트 노드 {self.node_id} 생성됨. 지갑 주소: {self.wallet.address[:10]}...")
+
+    def add_full_node(self, full_node):
+        if full_node not in self.full_nodes:
+            self.full_nodes.append(full_node)
+            print(f"LightNode {self.node_id}: 풀 노드 {full_node.node_id} 추가됨.")
+
+    def get_height(self):
+        return len(self.headers) - 1
+
+    def _is_header_valid(self, header, previous_header):
+        if header.hash != header.calculate_hash():
+            print(f"LightNode {self.node_id}: 헤더 #{header.index}의 해시가 내용과 일치하지 않음.")
+            return False
+        if previous_header is None: # 제네시스 블록은 PoW 없이 생성됨
+            return header.index == 0
+        if header.previous_hash != previous_header.hash or header.index != previous_header.index + 1:
+            print(f"LightNode {self.node_id}: 헤더 #{header.index}가 이전 헤더와 연결되지 않음.")
+            return False
+        if not header.hash.startswith('0' * self.difficulty):
+            print(f"LightNode {self.node_id}: 헤더 #{header.index}의 작업 증명이 유효하지 않음.")
+            return False
+        return True
+
+    def _fetch_headers(self, full_node):
+        """
+        풀 노드에서 자신의 헤더 체인에 이어지는 헤더들을 받아옵니다.
+        팁부터 1, 2, 4, ... 블록씩 거슬러 올라가며 분기 지점을 찾습니다. (시작 높이, 헤더 목록)을 반환.
+        """
+        back = 0
+        while True:
+            start_height = max(0, len(self.headers) - back)
+            headers = full_node.get_headers(start_height)
+            if start_height == 0 or not headers or headers[0].previous_hash == self.headers[start_height - 1].hash:
+                return start_height, headers
+            back = back * 2 if back else 1
+
+    def sync_headers(self):
+        """풀 노드들의 헤더를 받아 가장 긴 유효한 헤더 체인으로 갱신합니다. 갱신되면 True."""
+        updated = False
+        for full_node in self.full_nodes:
+            start_height, headers = self._fetch_headers(full_node)
+            if start_height + len(headers) <= len(self.headers):
+                continue # 더 길지 않음
+
+            previous_header = self.headers[start_height - 1] if start_height > 0 else None
+            valid = True
+            for header in headers:
+                if not self._is_header_valid(header, previous_header):
+                    valid = False
+                    break
+                previous_header = header
+            if not valid:
+                print(f"LightNode {self.node_id}: 풀 노드 {full_node.node_id}의 헤더 체인이 유효하지 않음.")
+                continue
+
+            # 분기 이후의 헤더를 교체
+            for header in self.headers[start_height:]:
+                self.header_heights.pop(header.hash, None)
+            del self.headers[start_height:]
+            for header in headers:
+                self.header_heights[header.hash] = len(self.headers)
+                self.headers.append(header)
+            updated = True
+            print(f"LightNode {self.node_id}: 풀 노드 {full_node.node_id}로부터 헤더 동기화 (높이 {self.get_height()}).")
+        return updated
+
+    def verify_payment(self, block_hash, transaction, proof, address=None):
+        """
+        머클 증명으로 트랜잭션이 자신의 헤더 체인에 포함되었는지 확인하고,
+        주소(기본: 자기 지갑)로 지급된 금액과 확인 수를 반환합니다. 검증 실패 시 None.
+        """
+        address = address if address is not None else self.wallet.address
+        height = self.header_heights.get(block_hash)
+        if height is None:
+            print(f"LightNode {self.node_id}: 블록 {block_hash[:10]}...가 헤더 체인에 없음.")
+            return None
+        if not Block.verify_merkle_proof(transaction.calculate_merkle_leaf(), proof, self.headers[height].merkle_root):
+            print(f"LightNode {self.node_id}: 트랜잭션 {transaction.transaction_id[:10]}의 머클 증명이 유효하지 않음.")
+            return None
+        amount = sum(out.amount for out in transaction.outputs if out.recipient_address == address)
+        confirmations = self.get_height() - height + 1
+        return amount, confirmations
+
+    def get_verified_payments(self, address=None):
+        """
+        풀 노드들에 자신의 주소로의 지급 증명을 요청하여 검증된 지급 목록을 반환합니다.
+        [(트랜잭션 ID, 금액, 확인 수), ...]
+        """
+        address = address if address is not None else self.wallet.address
+        payments = {}
+        for full_node in self.full_nodes:
+            for block_hash, transaction, proof in full_node.get_payment_proofs(address):
+                if transaction.transaction_id in payments:
+                    continue
+                result = self.verify_payment(block_hash, transaction, proof, address)
+                if result is not None:
+                    payments[transaction.transaction_id] = (transaction.transaction_id, result[0], result[1])
+        return list(payments.values())
+
+    def get_received_amount(self, min_confirmations=1):
+        """min_confirmations 이상 확인된 지급 금액 합계 (소비 여부는 반영되지 않음)."""
+        return sum(amount for _, amount, confirmations in self.get_verified_payments() if confirmations >= min_confirmations)
+
+    def __repr__(self):
+        return f"LightNode(ID: {self.node_id}, Height: {self.get_height()}, Headers: {len(self.headers)})"
@@ -1,15 +1,17 @@
 from Wallet import Wallet
 from Blockchain import Blockchain
 from Transaction import Transaction
+from UTXOView import UTXOView
 from const import INITIAL_DIFFICULTY
 
 
 class NetworkNode:
-    def __init__(self, node_id, difficulty=INITIAL_DIFFICULTY):
+    def __init__(self, node_id, difficulty=INITIAL_DIFFICULTY, enable_index=False, prune_depth=None):
         self.node_id = node_id
         self.wallet = Wallet() # 각 노드는 자신의 지갑을 가짐
-        self.blockchain = Blockchain(node_id, difficulty)
+        self.blockchain = Blockchain(node_id, difficulty, enable_index, prune_depth)
         self.mempool = {} # {tx_id: Transaction 객체}
+        self.mempool_view = UTXOView(self.blockchain.UTXOs) # 멤풀 트랜잭션까지 반영한 대기 중 UTXO 상태
         self.peers = [] # 다른 NetworkNode 객체들 (P2P 시뮬레이션용)
         print(f"네트워크 노드 {self.node_id} 생성됨. 지갑 주소: {self.wallet.address[:10]}...")
 
@@ -52,53 +54,133 @@ class NetworkNode:
                 print(f"Node {self.node_id}: 멤풀 추가 시 트랜잭션 {transaction.transaction_id[:10]} 서명 무효.")
                 return False
 
-            # 입력 UTXO가 현재 블록체인의 UTXO 풀에 실제로 존재하는지 확인 (매우 중요)
+            # 입력 UTXO가 대기 중 UTXO 상태(블록체인 UTXO 풀 + 멤풀 트랜잭션 반영)에 실제로 존재하는지 확인 (매우 중요)
             # 이 예제에서는 create_transaction 에서 이미 확인했으므로, 수신된 트랜잭션에 대해 더 중요
             required_input_value = 0
             for tx_input in transaction.inputs:
-                if tx_input.transaction_output_id not in self.blockchain.UTXOs:
+                # 이미 멤풀의 다른 트랜잭션에 의해 소비될 예정인 UTXO인지 확인 (이중 지불 방지)
+                if self.mempool_view.is_spent(tx_input.transaction_output_id):
+                    print(f"Node {self.node_id}: 이중 지불 시도 감지! UTXO {tx_input.transaction_output_id[:10]}가 이미 멤풀의 다른 트랜잭션에 의해 사용될 예정입니다.")
+                    return False
+                utxo = self.mempool_view.get(tx_input.transaction_output_id)
+                if utxo is None:
                     print(f"Node {self.node_id}: 멤풀 추가 시 트랜잭션 {transaction.transaction_id[:10]}의 입력 UTXO {tx_input.transaction_output_id[:10]}가 UTXO 풀에 없음.")
                     return False
-                # 이미 멤풀의 다른 트랜잭션에 의해 소비될 예정인 UTXO인지 확인 (이중 지불 방지)
-                for mem_tx_id, mem_tx in self.mempool.items():
-                    for mem_tx_input in mem_tx.inputs:
-                        if mem_tx_input.transaction_output_id == tx_input.transaction_output_id:
-                            print(f"Node {self.node_id}: 이중 지불 시도 감지! UTXO {tx_input.transaction_output_id[:10]}가 이미 멤풀의 다른 트랜잭션({mem_tx_id[:10]})에 의해 사용될 예정입니다.")
-                            return False
-                required_input_value += self.blockchain.UTXOs[tx_input.transaction_output_id].amount
+                required_input_value += utxo.amount
 
             # 보내는 금액과 출력 금액 일치 확인
-            total_output_value = sum(out.amount for out in transaction.outputs)
-            # 입력 총액이 출력 총액과 같거나, (입력총액 - 출력총액)이 수수료 개념일 수 있음.
-            # 여기서는 정확히 일치하는지만 (거스름돈 포함)
-            if required_input_value != total_output_value : # 거스름돈이 sender에게 정확히 가는지 확인
-                 # amount (보내는돈) + change (거스름돈) = total_output_value
-                 # 실제로는 (total_input_value - total_output_value) = 수수료 > 0 이어야 함
-                 # 이 코드에서는 수수료 개념이 없으므로, 입력=출력 이어야 함
-                 is_change_correct = False
-                 if len(transaction.outputs) == 1 and transaction.outputs[0].recipient_address == transaction.recipient_address and transaction.outputs[0].amount == transaction.amount and required_input_value == transaction.amount:
-                     is_change_correct = True # 거스름돈 없음
-                 elif len(transaction.outputs) == 2:
-                     to_recipient = False
-                     change_to_sender = False
-                     for out in transaction.outputs:
-                         if out.recipient_address == transaction.recipient_address and out.amount == transaction.amount:
-                             to_recipient = True
-                         if out.recipient_address == transaction.sender_address and out.amount == (required_input_value - transaction.amount):
-                             change_to_sender = True
-                     if to_recipient and change_to_sender:
-                         is_change_correct = True
-
-                 if not is_change_correct:
-                    print(f"Node {self.node_id}: 멤풀 추가 시 트랜잭션 {transaction.transaction_id[:10]}의 입출력 금액 불일치 또는 거스름돈 오류.")
-                    return False
-
+            if not self._is_amount_valid(transaction, required_input_value):
+                print(f"Node {self.node_id}: 멤풀 추가 시 트랜잭션 {transaction.transaction_id[:10]}의 입출력 금액 불일치 또는 거스름돈 오류.")
+                return False
 
             self.mempool[transaction.transaction_id] = transaction
+            self._apply_to_mempool_view(transaction)
             # print(f"Node {self.node_id}: 트랜잭션 {transaction.transaction_id[:10]} 멤풀에 추가됨.")
             return True
         return False # 이미 멤풀에 있음
 
+    @staticmethod
+    def _is_amount_valid(transaction, required_input_value):
+        """
+        멤풀 규칙에 따라 입출력 금액을 확인합니다.
+        입력 총액이 출력 총액과 같거나, (입력총액 - 출력총액)이 수수료 개념일 수 있음.
+        여기서는 정확히 일치하는지만 (거스름돈 포함)
+        """
+        total_output_value = sum(out.amount for out in transaction.outputs)
+        if required_input_value == total_output_value:
+            return True
+        # amount (보내는돈) + change (거스름돈) = total_output_value
+        # 실제로는 (total_input_value - total_output_value) = 수수료 > 0 이어야 함
+        # 이 코드에서는 수수료 개념이 없으므로, 입력=출력 이어야 함
+        if len(transaction.outputs) == 1 and transaction.outputs[0].recipient_address == transaction.recipient_address and transaction.outputs[0].amount == transaction.amount and required_input_value == transaction.amount:
+            return True # 거스름돈 없음
+        if len(transaction.outputs) == 2:
+            to_recipient = False
+            change_to_sender = False
+            for out in transaction.outputs:
+                if out.recipient_address == transaction.recipient_address and out.amount == transaction.amount:
+                    to_recipient = True
+                if out.recipient_address == transaction.sender_address and out.amount == (required_input_value - transaction.amount):
+                    change_to_sender = True
+            if to_recipient and change_to_sender:
+                return True
+        return False
+
+    def _apply_to_mempool_view(self, transaction):
+        """멤풀 트랜잭션을 대기 중 UTXO 뷰에 반영합니다. 입력이 이미 없으면 False."""
+        for tx_input in transaction.inputs:
+            if tx_input.transaction_output_id not in self.mempool_view:
+                return False
+        for tx_input in transaction.inputs:
+            self.mempool_view.spend(tx_input.transaction_output_id)
+        for out in transaction.outputs:
+            self.mempool_view.add(out.id, out)
+        return True
+
+    def adopt_chain(self, new_chain, utxo_view):
+        """
+        Blockchain.evaluate_fork로 검증된 체인으로 교체하고 멤풀을 새 체인에 맞게 갱신합니다.
+        해제된(끊어진) 블록 수를 반환합니다.
+        """
+        fork_height = self.blockchain.find_fork_point(new_chain)
+        # 가지치기된 블록은 본문이 없으므로 멤풀로 되돌릴 트랜잭션도 없음 (공통 조상이 없는 교체에서만 해당)
+        disconnected_blocks = [block for block in self.blockchain.chain[fork_height + 1:] if not Blockchain.is_pruned(block)]
+        connected_blocks = new_chain[fork_height + 1:]
+        self.blockchain.replace_chain(new_chain, utxo_view)
+
+        # 체인이 바뀌었으므로 멤풀을 새 체인의 UTXO 기준으로 다시 맞춤 (비우지 않음)
+        self.update_mempool_after_reorg(disconnected_blocks, connected_blocks)
+        print(f"Node {self.node_id}: 체인 교체 후 멤풀 재검증 완료. 멤풀 크기: {len(self.mempool)}")
+        return len(disconnected_blocks)
+
+    def update_mempool_after_reorg(self, disconnected_blocks, connected_blocks):
+        """
+        체인 재구성 후 멤풀을 갱신합니다.
+        1. 끊어진 블록의 트랜잭션(코인베이스 제외)을 멤풀로 되돌림.
+        2. 새 체인에 이미 포함된 트랜잭션은 제외.
+        3. 나머지를 새 UTXO 풀 기준으로 재검증하여, 충돌하거나 금액 규칙에 맞지 않는 트랜잭션만 제거.
+        서명은 블록 연결/멤풀 추가 시 이미 검증되었으므로 입력 UTXO 상태와 금액 규칙만 다시 확인합니다.
+        """
+        confirmed_tx_ids = {tx.transaction_id for block in connected_blocks for tx in block.transactions}
+
+        # 끊어진 블록의 트랜잭션을 먼저 (블록 순서대로) 넣어야 그 출력을 쓰는 멤풀 트랜잭션이 유효하게 남음
+        pending = {}
+        for block in disconnected_blocks:
+            for tx in block.transactions:
+                if tx.is_coinbase() or tx.transaction_id in confirmed_tx_ids:
+                    continue
+                pending[tx.transaction_id] = tx
+        returned_count = len(pending)
+        for tx_id, tx in self.mempool.items():
+            if tx_id not in confirmed_tx_ids and tx_id not in pending:
+                pending[tx_id] = tx
+
+        self.mempool.clear()
+        self.mempool.update(pending)
+        self._refresh_mempool_view() # 새 체인과 충돌하는 트랜잭션은 여기서 제거됨
+        if returned_count > 0:
+            print(f"Node {self.node_id}: 끊어진 블록의 트랜잭션 {returned_count}개를 멤풀로 되돌림.")
+
+    def _refresh_mempool_view(self):
+        """
+        체인이 바뀐 뒤 대기 중 UTXO 뷰를 새 UTXO 풀 위에 다시 쌓습니다.
+        남은 멤풀 트랜잭션만 다시 반영하므로 비용은 멤풀 크기에 비례하며,
+        새 체인과 충돌하는(입력이 이미 소비된) 트랜잭션과 멤풀 금액 규칙에 맞지 않는
+        트랜잭션은 멤풀에서 제거합니다.
+        """
+        self.mempool_view = UTXOView(self.blockchain.UTXOs)
+        for tx_id, tx in list(self.mempool.items()):
+            # 블록 검증은 입력 >= 출력만 요구하므로, 블록에서 되돌아온 트랜잭션은 멤풀 금액 규칙도 다시 확인
+            input_utxos = [self.mempool_view.get(tx_input.transaction_output_id) for tx_input in tx.inputs]
+            if None in input_utxos:
+                del self.mempool[tx_id]
+                print(f"Node {self.node_id}: 트랜잭션 {tx_id[:10]}가 새 체인과 충돌하여 멤풀에서 제거됨.")
+            elif not self._is_amount_valid(tx, sum(utxo.amount for utxo in input_utxos)):
+                del self.mempool[tx_id]
+                print(f"Node {self.node_id}: 트랜잭션 {tx_id[:10]}의 입출력 금액이 멤풀 규칙에 맞지 않아 제거됨.")
+            else:
+                self._apply_to_mempool_view(tx)
+
 
     def broadcast_transaction(self, transaction):
         """트랜잭션을 모든 피어에게 전파합니다."""
@@ -133,6 +215,7 @@ class NetworkNode:
             for tx in transactions_to_mine:
                 if tx.transaction_id in self.mempool:
                     del self.mempool[tx.transaction_id]
+            self._refresh_mempool_view()
             print(f"Node {self.node_id}: 블록 채굴 후 멤풀 정리. 남은 멤풀 크기: {len(self.mempool)}")
             self.broadcast_block(new_block)
             return new_block
@@ -158,6 +241,7 @@ class NetworkNode:
                 for tx in block.transactions:
                     if tx.transaction_id in self.mempool:
                         del self.mempool[tx.transaction_id]
+                self._refresh_mempool_view()
                 print(f"Node {self.node_id}: 수신한 블록 #{block.index} 체인에 추가 완료. 멤풀 업데이트.")
                 # 자신이 받은 블록이므로 다시 전파할 필요는 없음 (네트워크 정책에 따라 다를 수 있음)
             else:
@@ -184,11 +268,33 @@ class NetworkNode:
             pass
 
 
+    def get_headers(self, start_height, max_count=None):
+        """라이트 노드용: start_height부터의 블록 헤더 목록을 반환합니다."""
+        end_height = len(self.blockchain.chain) if max_count is None else start_height + max_count
+        return [block.get_header() for block in self.blockchain.chain[start_height:end_height]]
+
+    def get_merkle_proof(self, transaction_id):
+        """라이트 노드용: (블록 해시, 트랜잭션, 머클 증명)을 반환합니다. 체인에 없으면 None."""
+        found = self.blockchain.get_transaction(transaction_id)
+        if found is None:
+            return None
+        block, tx = found
+        return block.hash, tx, block.get_merkle_proof(transaction_id)
+
+    def get_payment_proofs(self, address):
+        """라이트 노드용: 주소로 지급한 트랜잭션들의 (블록 해시, 트랜잭션, 머클 증명) 목록을 반환합니다."""
+        proofs = []
+        for tx_id in self.blockchain.get_address_history(address):
+            proof = self.get_merkle_proof(tx_id)
+            if proof is not None and any(out.recipient_address == address for out in proof[1].outputs):
+                proofs.append(proof)
+        return proofs
+
     def resolve_conflicts(self, network_nodes_list):
         """네트워크의 다른 노드들과 체인을 비교하여 가장 긴 유효한 체인으로 교체합니다 (Longest Chain Rule)."""
-        longest_chain = list(self.blockchain.chain) # 자신의 체인으로 시작
-        current_max_length = len(longest_chain)
-        new_utxo_pool = dict(self.blockchain.UTXOs) # 교체될 경우의 UTXO 풀
+        current_max_length = len(self.blockchain.chain)
+        longest_chain = None # 교체될 경우의 체인
+        new_utxo_view = None # 교체될 경우의 UTXO 변경분 (현재 UTXO 풀 위의 오버레이)
 
         for peer_node in network_nodes_list:
             if peer_node == self: continue
@@ -197,53 +303,19 @@ class NetworkNode:
             if len(peer_chain) > current_max_length:
                 # 더 긴 체인을 찾았으면, 해당 체인이 유효한지 검사해야 함
                 # 유효성 검사는 해당 노드의 difficulty를 사용해야 하지만, 여기서는 자신의 difficulty 사용
-                temp_blockchain_for_validation = Blockchain(f"temp_validator_for_{peer_node.node_id}", self.blockchain.difficulty)
-                temp_blockchain_for_validation.chain = [] # 비우고
-
-                # 제네시스 블록 복사
-                if peer_chain:
-                    # 제네시스 블록은 UTXO 변경 없이 그대로 추가
-                    temp_blockchain_for_validation.chain.append(peer_chain[0])
-
-                    # 나머지 블록들을 순차적으로 add_block하며 UTXO 재구성
-                    valid_so_far = True
-                    temp_utxos_for_validation = {} # 초기 UTXO 풀 (제네시스 이후)
-
-                    for i in range(1, len(peer_chain)):
-                        block_to_add = peer_chain[i]
-                        # add_block은 내부적으로 UTXO를 업데이트하므로, 임시 UTXO 풀을 사용해야 함
-                        # add_block전에 temp_blockchain_for_validation.UTXOs 를 temp_utxos_for_validation 로 설정
-                        original_utxos = dict(temp_blockchain_for_validation.UTXOs) # 백업
-                        temp_blockchain_for_validation.UTXOs = dict(temp_utxos_for_validation) # 현재까지 재구성된 UTXO로 설정
-
-                        if not temp_blockchain_for_validation.add_block(block_to_add):
-                            print(f"Node {self.node_id}: 피어 {peer_node.node_id}의 체인 검증 중 블록 {block_to_add.index} 유효성 실패.")
-                            valid_so_far = False
-                            temp_blockchain_for_validation.UTXOs = original_utxos # 복원
-                            break
-                        else:
-                            # 성공적으로 추가되었으면, 업데이트된 UTXO 풀을 다음 검증에 사용
-                            temp_utxos_for_validation = dict(temp_blockchain_for_validation.UTXOs)
-                            temp_blockchain_for_validation.UTXOs = original_utxos # 복원 (add_block은 내부 UTXO를 바꾸므로)
-
-
-                    if valid_so_far:
-                        print(f"Node {self.node_id}: 피어 {peer_node.node_id}의 체인(길이 {len(peer_chain)})이 더 길고 유효함. 교체 대상으로 설정.")
-                        current_max_length = len(peer_chain)
-                        longest_chain = list(peer_chain) # 리스트 복사
-                        new_utxo_pool = dict(temp_utxos_for_validation) # 유효성 검증을 통해 재구성된 UTXO 풀
-                    else:
-                        print(f"Node {self.node_id}: 피어 {peer_node.node_id}의 체인이 길지만 유효하지 않음.")
-
-        if longest_chain != self.blockchain.chain: # 자신의 체인과 다르면 (즉, 다른 노드의 체인이 선택되었으면)
+                # 공통 조상 이후의 블록만 오버레이 뷰 위에서 되돌리고/연결하므로 UTXO 풀 전체를 복사하지 않음
+                candidate_chain, utxo_view = self.blockchain.evaluate_fork(peer_chain)
+                if candidate_chain is not None:
+                    print(f"Node {self.node_id}: 피어 {peer_node.node_id}의 체인(길이 {len(peer_chain)})이 더 길고 유효함. 교체 대상으로 설정.")
+                    current_max_length = len(candidate_chain)
+                    longest_chain = candidate_chain
+                    new_utxo_view = utxo_view
+                else:
+                    print(f"Node {self.node_id}: 피어 {peer_node.node_id}의 체인이 길지만 유효하지 않음.")
+
+        if longest_chain is not None: # 다른 노드의 체인이 선택되었으면
             print(f"Node {self.node_id}: 체인 충돌 해결. 새로운 체인(길이 {len(longest_chain)})으로 교체합니다.")
-            self.blockchain.chain = longest_chain
-            self.blockchain.UTXOs = new_utxo_pool # 재구성된 UTXO 풀로 교체
-
-            # 체인이 바뀌었으므로 멤풀의 트랜잭션들을 다시 검증해야 할 수 있음 (새 체인의 UTXO 기준)
-            # 여기서는 간단히 멤풀을 비우는 것으로 처리
-            self.mempool.clear()
-            print(f"Node {self.node_id}: 체인 교체 후 멤풀 초기화됨.")
+            self.adopt_chain(longest_chain, new_utxo_view)
             return True
         else:
             # print(f"Node {self.node_id}: 현재 체인이 가장 김. 변경 없음.")
@@ -0,0 +1,251 @@
+import heapq
+import math
+import os
+import random
+import statistics
+from contextlib import contextmanager, redirect_stdout
+from NetworkNode import NetworkNode
+
+TOPOLOGIES = ("random", "small-world", "full")
+LATENCY_MODELS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+def build_topology(node_count, kind, degree, rewire_prob, rng):
+    """노드별 이웃 집합 리스트를 만듭니다 (무방향 그래프)."""
+    neighbors = [set() for _ in range(node_count)]
+
+    def connect(a, b):
+        if a != b:
+            neighbors[a].add(b)
+            neighbors[b].add(a)
+
+    if kind == "full":
+        for a in range(node_count):
+            for b in range(a + 1, node_count):
+                connect(a, b)
+    elif kind == "small-world":
+        # Watts-Strogatz: 각 노드를 링에서 양쪽 degree/2개 이웃과 연결한 뒤, 간선을 rewire_prob 확률로 재배선
+        half = max(1, degree // 2)
+        for a in range(node_count):
+            for offset in range(1, half + 1):
+                b = (a + offset) % node_count
+                if rng.random() < rewire_prob:
+                    candidates = [c for c in range(node_count) if c != a and c not in neighbors[a]]
+                    if candidates:
+                        b = rng.choice(candidates)
+                connect(a, b)
+    elif kind == "random":
+        # 임의 그래프: 평균 차수가 degree가 되도록 간선을 무작위로 추가.
+        # 연결성을 보장하기 위해 먼저 무작위 순서의 경로(스패닝 트리)를 깐다.
+        order = list(range(node_count))
+        rng.shuffle(order)
+        for a, b in zip(order, order[1:]):
+            connect(a, b)
+        target_edges = node_count * degree // 2
+        edge_count = node_count - 1
+        max_edges = node_count * (node_count - 1) // 2
+        while edge_count < min(target_edges, max_edges):
+            a, b = rng.randrange(node_count), rng.randrange(node_count)
+            if a != b and b not in neighbors[a]:
+                connect(a, b)
+                edge_count += 1
+    else:
+        raise ValueError(f"알 수 없는 토폴로지: {kind} (가능: {', '.join(TOPOLOGIES)})")
+    return neighbors
+
+
+def make_latency_sampler(kind, mean_latency, rng):
+    """메시지 하나의 전파 지연(초)을 뽑는 함수를 반환합니다."""
+    if kind == "fixed":
+        return lambda: mean_latency
+    if kind == "uniform":
+        return lambda: rng.uniform(0.5 * mean_latency, 1.5 * mean_latency)
+    if kind == "exponential":
+        return lambda: rng.expovariate(1.0 / mean_latency)
+    if kind == "lognormal":
+        sigma = 0.5
+        mu = math.log(mean_latency) - sigma * sigma / 2 # 평균이 mean_latency가 되도록
+        return lambda: rng.lognormvariate(mu, sigma)
+    raise ValueError(f"알 수 없는 지연 모델: {kind} (가능: {', '.join(LATENCY_MODELS)})")
+
+
+class Simulation:
+    """
+    이산 사건(discrete-event) 기반 다중 노드 시뮬레이션.
+    - 채굴: 각 채굴자는 해시 파워 비율에 따라 포아송 과정으로 블록을 발견 (평균 블록 간격 block_interval초).
+      블록 자체는 낮은 difficulty로 실제 PoW를 거쳐 만들어지므로 노드들은 실제 검증 로직을 그대로 사용.
+    - 전파: 블록을 처음 본 노드는 이웃들에게 지연 모델에 따른 시간 뒤 도착하는 사건으로 전달.
+    - 시간은 sleep 없이 사건 큐(heapq)의 가상 시간으로 진행.
+    포크 비율(채굴됐지만 최종 체인에 없는 블록 비율)과 블록 전파 지연을 측정합니다.
+    """
+    def __init__(self, node_count=100, topology="random", degree=8, rewire_prob=0.1,
+                 latency_model="exponential", mean_latency=0.5, miner_count=10, hash_rates=None,
+                 block_interval=10.0, difficulty=1, prune_depth=None, seed=None, verbose=False):
+        self.rng = random.Random(seed)
+        self.verbose = verbose # False이면 노드들의 상세 로그 출력을 숨김
+        self.block_interval = block_interval
+
+        with self._node_output():
+            self.nodes = [NetworkNode(f"Sim{i}", difficulty=difficulty, prune_depth=prune_depth) for i in range(node_count)]
+            # 모든 노드가 같은 제네시스 블록에서 시작
+            genesis_block = self.nodes[0].blockchain.chain[0]
+            for node in self.nodes[1:]:
+                node.blockchain.reset_chain(genesis_block)
+
+        # 이웃 관계는 시뮬레이터가 관리 (NetworkNode.peers는 즉시 전파이므로 사용하지 않음)
+        self.neighbors = build_topology(node_count, topology, degree, rewire_prob, self.rng)
+        self.sample_latency = make_latency_sampler(latency_model, mean_latency, self.rng)
+
+        # 채굴자와 해시 파워 (상대값). 기본은 무작위로 고른 miner_count개 노드가 동일한 해시 파워
+        if hash_rates is not None:
+            if not hash_rates or any(rate <= 0 for rate in hash_rates):
+                raise ValueError(f"해시 파워는 모두 0보다 커야 합니다: {hash_rates}")
+            if len(hash_rates) > node_count:
+                raise ValueError(f"해시 파워 수({len(hash_rates)})가 노드 수({node_count})보다 많습니다.")
+            miner_count = len(hash_rates)
+        miner_count = min(miner_count, node_count)
+        self.miners = self.rng.sample(range(node_count), miner_count)
+        rates = hash_rates if hash_rates is not None else [1.0] * miner_count
+        total_rate = float(sum(rates))
+        # 채굴자별 블록 발견율 (초당). 전체 합은 1 / block_interval
+        self.mining_rates = {miner: rate / total_rate / block_interval for miner, rate in zip(self.miners, rates)}
+
+        self.now = 0.0
+        self._events = [] # (시각, 순번, 사건 종류, 데이터)
+        self._event_seq = 0
+        self.blocks = {genesis_block.hash: genesis_block} # {block_hash: Block} 제네시스 + 채굴된 모든 블록
+        self.block_miners = {} # {block_hash: 채굴 노드 번호} (채굴된 블록만)
+        self.seen = [{genesis_block.hash} for _ in range(node_count)] # 노드별로 받은 블록 해시
+        self.orphans = [{} for _ in range(node_count)] # 노드별 {부모 해시: [부모를 아직 못 받은 블록]}
+        self.arrival_times = {} # {block_hash: [각 노드에 도착한 시각, ...]}
+        self.reorg_depths = [] # 발생한 체인 재구성의 깊이 (해제된 블록 수)
+
+    @contextmanager
+    def _node_output(self):
+        """verbose가 아니면 블록 안에서 노드들의 출력을 버립니다."""
+        if self.verbose:
+            yield
+            return
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            yield
+
+    def _schedule(self, delay, kind, data):
+        self._event_seq += 1
+        heapq.heappush(self._events, (self.now + delay, self._event_seq, kind, data))
+
+    def _schedule_next_mining(self, miner):
+        self._schedule(self.rng.expovariate(self.mining_rates[miner]), "mine", miner)
+
+    def _relay(self, node_index, block):
+        for neighbor in self.neighbors[node_index]:
+            if block.hash not in self.seen[neighbor]:
+                self._schedule(self.sample_latency(), "deliver", (neighbor, block, node_index))
+
+    def _on_mine(self, miner):
+        node = self.nodes[miner]
+        block = node.mine_new_block() # peers가 비어 있으므로 즉시 전파는 일어나지 않음
+        if block is None:
+            return
+        self.blocks[block.hash] = block
+        self.block_miners[block.hash] = miner
+        self.seen[miner].add(block.hash)
+        self.arrival_times[block.hash] = [self.now]
+        self._relay(miner, block)
+
+    def _on_deliver(self, node_index, block, sender_index):
+        if block.hash in self.seen[node_index]:
+            return
+        self.seen[node_index].add(block.hash)
+        self.arrival_times[block.hash].append(self.now)
+        self._relay(node_index, block)
+        self._try_connect(node_index, block, sender_index)
+
+    def _try_connect(self, node_index, block, sender_index):
+        """받은 블록으로 체인을 연장하거나, 더 긴 분기가 되면 체인을 재구성합니다."""
+        node = self.nodes[node_index]
+        chain = node.blockchain.chain
+        tip = chain[-1]
+
+        if block.previous_hash == tip.hash:
+            node.receive_block(block, self.nodes[sender_index])
+        elif block.index > tip.index:
+            # 자기 체인과 만나는 지점까지 받은 블록들을 거슬러 올라가 분기를 구성
+            branch = []
+            current = block
+            while not (current.index < len(chain) and chain[current.index].hash == current.hash):
+                branch.append(current)
+                if current.previous_hash not in self.seen[node_index]:
+                    # 조상 블록을 아직 못 받음: 부모가 도착하면 다시 시도
+                    self.orphans[node_index].setdefault(current.previous_hash, []).append(block)
+                    return
+                current = self.blocks[current.previous_hash]
+            candidate_chain = chain[:current.index + 1] + list(reversed(branch))
+            new_chain, utxo_view = node.blockchain.evaluate_fork(candidate_chain)
+            if new_chain is not None:
+                disconnected_count = node.adopt_chain(new_chain, utxo_view)
+                if disconnected_count:
+                    self.reorg_depths.append(disconnected_count)
+
+        # 이 블록을 기다리던 (부모가 없던) 블록들 재시도
+        for waiting_block in self.orphans[node_index].pop(block.hash, []):
+            self._try_connect(node_index, waiting_block, sender_index)
+
+    def run(self, block_count):
+        """block_count개의 블록이 채굴될 때까지 시뮬레이션하고, 남은 전파 사건을 마저 처리합니다."""
+        for miner in self.miners:
+            self._schedule_next_mining(miner)
+
+        with self._node_output():
+            while self._events:
+                event_time, _, kind, data = heapq.heappop(self._events)
+                if kind == "mine" and len(self.block_miners) >= block_count:
+                    continue # 목표 블록 수 도달 후에는 전파만 마무리
+                self.now = event_time
+                if kind == "mine":
+                    self._on_mine(data)
+                    self._schedule_next_mining(data)
+                else:
+                    self._on_deliver(*data)
+        return self.summary()
+
+    def summary(self):
+        """포크 비율, 전파 지연, 재구성 통계를 dict로 반환합니다."""
+        node_count = len(self.nodes)
+        best_chain = max((node.blockchain.chain for node in self.nodes), key=len)
+        main_chain_hashes = {block.hash for block in best_chain}
+        stale_count = sum(1 for block_hash in self.block_miners if block_hash not in main_chain_hashes)
+
+        def propagation_delays(fraction):
+            needed = max(1, math.ceil(fraction * node_count))
+            delays = []
+            for times in self.arrival_times.values():
+                if len(times) >= needed:
+                    delays.append(sorted(times)[needed - 1] - times[0])
+            return delays
+
+        result = {
+            "nodes": node_count,
+            "miners": len(self.miners),
+            "simulated_seconds": self.now,
+            "blocks_mined": len(self.block_miners),
+            "main_chain_height": best_chain[-1].index,
+            "stale_blocks": stale_count,
+            "fork_rate": stale_count / len(self.block_miners) if self.block_miners else 0.0,
+            "reorgs": len(self.reorg_depths),
+            "max_reorg_depth": max(self.reorg_depths, default=0),
+            "nodes_on_best_tip": sum(1 for node in self.nodes if node.blockchain.get_last_block().hash == best_chain[-1].hash),
+        }
+        for fraction in (0.5, 0.9, 1.0):
+            delays = propagation_delays(fraction)
+            result[f"propagation_{int(fraction * 100)}pct_mean"] = statistics.mean(delays) if delays else None
+            result[f"propagation_{int(fraction * 100)}pct_median"] = statistics.median(delays) if delays else None
+        return result
+
+    @staticmethod
+    def print_summary(result):
+        print("\n--- 시뮬레이션 결과 ---")
+        for key, value in result.items():
+            if isinstance(value, float):
+                print(f"  {key}: {value:.4f}")
+            else:
+                print(f"  {key}: {value}")
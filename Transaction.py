@@ -1,8 +1,10 @@
 import hashlib
 import time
 import json
+from TransactionInput import TransactionInput
 from TransactionOutput import TransactionOutput
 from Wallet import Wallet
+from const import MINING_REWARD
 
 class Transaction:
     sequence = 0 # 트랜잭션 고유 ID 생성을 위한 카운터 (단순화)
@@ -33,6 +35,14 @@ class Transaction:
         }
         return hashlib.sha256(json.dumps(data_to_hash, sort_keys=True).encode()).hexdigest()
 
+    def calculate_merkle_leaf(self):
+        """머클 트리의 잎 해시. 트랜잭션 ID와 출력(수신자, 금액)을 함께 해싱하여 SPV 검증 시 지급 내역까지 증명되게 함."""
+        leaf_data = {
+            "transaction_id": self.transaction_id,
+            "outputs": [[out.recipient_address, out.amount] for out in self.outputs]
+        }
+        return hashlib.sha256(json.dumps(leaf_data, sort_keys=True).encode()).hexdigest()
+
     def get_data_to_sign(self):
         """서명할 데이터를 생성합니다. 트랜잭션 ID와 유사하지만, 서명 후 ID가 확정될 수도 있음."""
         # 이 예제에서는 transaction_id 계산에 사용된 데이터와 동일하게 사용
@@ -55,6 +65,11 @@ class Transaction:
         self.signature = sender_wallet.sign_transaction(data_to_sign)
         return True
 
+    def is_coinbase(self):
+        """입력 없이 채굴 보상 하나만 만드는 코인베이스 트랜잭션인지 여부 (서명 검증 대상 아님)."""
+        return (not self.inputs and len(self.outputs) == 1 and self.outputs[0].amount == MINING_REWARD
+                and self.transaction_id.startswith("coinbase"))
+
     def is_signature_valid(self):
         """트랜잭션 서명을 검증합니다."""
         if not self.signature:
@@ -107,6 +122,35 @@ class Transaction:
 
         return True
 
+    def to_dict(self):
+        """직렬화용 dict (서명 포함)."""
+        return {
+            "transaction_id": self.transaction_id,
+            "sender_address": self.sender_address,
+            "sender_public_key": self.sender_public_key,
+            "recipient_address": self.recipient_address,
+            "amount": self.amount,
+            "timestamp": self.timestamp,
+            "inputs": [inp.to_dict() for inp in self.inputs],
+            "outputs": [out.to_dict() for out in self.outputs],
+            "signature": self.signature,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """to_dict 결과로부터 트랜잭션을 복원합니다 (지갑 없이, ID를 다시 계산하지 않음)."""
+        tx = cls.__new__(cls)
+        tx.transaction_id = data["transaction_id"]
+        tx.sender_address = data["sender_address"]
+        tx.sender_public_key = data["sender_public_key"]
+        tx.recipient_address = data["recipient_address"]
+        tx.amount = data["amount"]
+        tx.timestamp = data["timestamp"]
+        tx.inputs = [TransactionInput.from_dict(inp) for inp in data["inputs"]]
+        tx.outputs = [TransactionOutput.from_dict(out) for out in data["outputs"]]
+        tx.signature = data["signature"]
+        return tx
+
     def __repr__(self):
         return (f"Transaction(ID: {self.transaction_id[:10]}..., "
                 f"From: {self.sender_address[:10]}..., To: {self.recipient_address[:10]}..., "
@@ -12,6 +12,18 @@ class TransactionOutput:
             return f"{self.parent_transaction_id}_{self.index_in_parent}"
         return None
 
+    def to_dict(self):
+        return {
+            "recipient_address": self.recipient_address,
+            "amount": self.amount,
+            "parent_transaction_id": self.parent_transaction_id,
+            "index_in_parent": self.index_in_parent,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["recipient_address"], data["amount"], data["parent_transaction_id"], data["index_in_parent"])
+
     def is_mine(self, address):
         return self.recipient_address == address
 
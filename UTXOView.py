@@ -0,0 +1,71 @@
+
+class UTXOView:
+    """
+    UTXO 풀 위에 얹는 오버레이 뷰.
+    기반 풀(dict 또는 다른 UTXOView)은 건드리지 않고 추가/소비 내역만 기록하므로,
+    블록 검증이나 포크 평가 시 전체 UTXO 풀을 복사할 필요가 없습니다.
+    commit()은 기록된 변경분만 기반 풀에 반영합니다 (O(변경 수)).
+    """
+    def __init__(self, base):
+        self.base = base # 기반 UTXO 풀: {utxo_id: TransactionOutput 객체} 또는 UTXOView
+        self.added = {} # 이 뷰에서 새로 생긴 UTXO: {utxo_id: TransactionOutput 객체}
+        self.spent = set() # 이 뷰에서 소비된 UTXO ID
+
+    def __contains__(self, utxo_id):
+        if utxo_id in self.added:
+            return True
+        if utxo_id in self.spent:
+            return False
+        return utxo_id in self.base
+
+    def __getitem__(self, utxo_id):
+        utxo = self.get(utxo_id)
+        if utxo is None:
+            raise KeyError(utxo_id)
+        return utxo
+
+    def get(self, utxo_id, default=None):
+        if utxo_id in self.added:
+            return self.added[utxo_id]
+        if utxo_id in self.spent:
+            return default
+        return self.base.get(utxo_id, default)
+
+    def add(self, utxo_id, utxo):
+        """UTXO를 뷰에 추가합니다."""
+        self.spent.discard(utxo_id)
+        self.added[utxo_id] = utxo
+
+    def spend(self, utxo_id):
+        """UTXO를 뷰에서 소비(제거)합니다."""
+        self.added.pop(utxo_id, None)
+        self.spent.add(utxo_id)
+
+    def is_spent(self, utxo_id):
+        """이 뷰 또는 기반 뷰들에서 소비된 UTXO인지 여부."""
+        if utxo_id in self.spent:
+            return True
+        if utxo_id in self.added:
+            return False
+        return isinstance(self.base, UTXOView) and self.base.is_spent(utxo_id)
+
+    def commit(self):
+        """기록된 변경분을 기반 풀에 반영하고 뷰를 비웁니다."""
+        if isinstance(self.base, UTXOView):
+            for utxo_id in self.spent:
+                self.base.spend(utxo_id)
+            for utxo_id, utxo in self.added.items():
+                self.base.add(utxo_id, utxo)
+        else:
+            for utxo_id in self.spent:
+                self.base.pop(utxo_id, None)
+            self.base.update(self.added)
+        self.discard()
+
+    def discard(self):
+        """기록된 변경분을 버립니다 (기반 풀은 그대로)."""
+        self.added = {}
+        self.spent = set()
+
+    def __repr__(self):
+        return f"UTXOView(Added: {len(self.added)}, Spent: {len(self.spent)})"
@@ -1,11 +1,16 @@
 
 import hashlib
-from ecdsa import SigningKey, VerifyingKey, NIST256p, BadSignatureError # NIST256p는 secp256k1과 유사한 타원 곡선
+from collections import OrderedDict
+from ecdsa import SigningKey, VerifyingKey, NIST256p, BadSignatureError, MalformedPointError, ellipticcurve # NIST256p는 secp256k1과 유사한 타원 곡선
 import binascii # 바이트 <-> 16진수 문자열 변환
+from const import KEY_CACHE_SIZE
 
 
 
 class Wallet:
+    # 공개키 바이트 -> [VerifyingKey, 사전계산 여부] 캐시 (LRU, 모든 검증자가 공유)
+    _key_cache = OrderedDict()
+
     def __init__(self):
         self.private_key = SigningKey.generate(curve=NIST256p)
         self.public_key = self.private_key.get_verifying_key()
@@ -13,12 +18,43 @@ class Wallet:
 
     def generate_address(self, public_key):
         """공개키로부터 주소를 생성합니다 (간단한 방식)."""
+        return Wallet._derive_address(public_key.to_string())
+
+    @staticmethod
+    def _derive_address(public_key_bytes):
         # 실제 비트코인은 여러 단계의 해싱과 인코딩(Base58Check)을 거침
-        public_key_bytes = public_key.to_string()
         sha256_hash = hashlib.sha256(public_key_bytes).digest()
         ripemd160_hash = hashlib.new('ripemd160', sha256_hash).hexdigest() # hex string으로 주소 표현
         return ripemd160_hash # 단순화를 위해 ripemd160 해시 자체를 주소로 사용
 
+    @staticmethod
+    def _load_public_key(public_key_bytes):
+        """
+        공개키 바이트에 대한 VerifyingKey를 캐시에서 찾거나 새로 만들어 반환합니다.
+        처음 본 키는 디코딩만 해 두고, 다시 검증할 때 서명 검증용 사전계산 테이블을 만듭니다
+        (한 번만 쓰이는 키가 테이블 생성 비용과 메모리를 치르지 않도록).
+        """
+        cache = Wallet._key_cache
+        entry = cache.get(public_key_bytes)
+        if entry is None:
+            vk = VerifyingKey.from_string(public_key_bytes, curve=NIST256p)
+            entry = [vk, False]
+            cache[public_key_bytes] = entry
+            if len(cache) > KEY_CACHE_SIZE:
+                cache.popitem(last=False) # 가장 오래 사용되지 않은 키 제거
+            return vk
+
+        cache.move_to_end(public_key_bytes) # 최근 사용으로 갱신
+        if not entry[1]:
+            point = entry[0].pubkey.point
+            # from_string으로 만든 점에는 위수(order)가 없어 precompute가 실패하므로, 위수를 가진 점으로 다시 생성
+            point = ellipticcurve.Point(NIST256p.curve, point.x(), point.y(), NIST256p.order)
+            vk = VerifyingKey.from_public_point(point, curve=NIST256p)
+            vk.precompute()
+            entry[0] = vk
+            entry[1] = True
+        return entry[0]
+
     def sign_transaction(self, transaction_data_str):
         """트랜잭션 데이터에 서명합니다."""
         signature_bytes = self.private_key.sign(transaction_data_str.encode())
@@ -30,9 +66,9 @@ class Wallet:
         try:
             public_key_bytes = binascii.unhexlify(public_key_hex)
             signature_bytes = binascii.unhexlify(signature_hex)
-            vk = VerifyingKey.from_string(public_key_bytes, curve=NIST256p)
+            vk = Wallet._load_public_key(public_key_bytes)
             return vk.verify(signature_bytes, data_str.encode())
-        except (BadSignatureError, binascii.Error):
+        except (BadSignatureError, binascii.Error, MalformedPointError):
             return False
 
     def get_public_key_hex(self):
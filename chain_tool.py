@@ -0,0 +1,159 @@
+import argparse
+import gzip
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from Block import Block
+from Blockchain import Blockchain
+from NetworkNode import NetworkNode
+from const import INITIAL_DIFFICULTY
+
+# 체인 파일 형식: 한 줄에 블록 하나 (JSON Lines, 공백 없는 JSON). 파일명이 .gz로 끝나면 gzip 압축.
+# 블록 단위로 읽고 쓰므로 메모리 사용량은 체인 길이와 무관합니다.
+
+
+def _open_chain_file(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def export_chain(blockchain, path):
+    """블록체인을 파일로 블록 단위 스트리밍 저장합니다. 저장한 블록 수를 반환합니다 (가지치기된 체인은 None)."""
+    if blockchain.pruned_height > 0:
+        print(f"Node {blockchain.node_id}: 내보내기 오류 - 블록 #{blockchain.pruned_height}까지 본문이 가지치기되어 전체 체인을 내보낼 수 없음.")
+        return None
+    count = 0
+    with _open_chain_file(path, "w") as f:
+        for block in blockchain.chain:
+            f.write(json.dumps(block.to_dict(), separators=(",", ":")))
+            f.write("\n")
+            count += 1
+    print(f"Node {blockchain.node_id}: 블록 {count}개를 {path}로 내보냄.")
+    return count
+
+
+def _decode_and_verify(line):
+    """
+    (작업 프로세스에서 실행) 한 줄을 블록으로 디코딩하고, UTXO 상태와 무관한 검사
+    (해시 재계산, 트랜잭션 서명)를 미리 수행합니다.
+    (block, 사전검사 통과 여부, 서명을 검증한 트랜잭션의 블록 내 위치 집합)을 반환하며,
+    디코딩할 수 없는 줄이면 (None, False, None).
+    """
+    try:
+        block = Block.from_dict(json.loads(line))
+    except (ValueError, KeyError, TypeError): # 잘리거나 형식이 잘못된 줄
+        return None, False, None
+    if block.hash != block.calculate_hash():
+        return block, False, None
+    verified_positions = set()
+    for position, tx in enumerate(block.transactions):
+        if tx.is_coinbase():
+            continue
+        if not tx.is_signature_valid():
+            return block, False, None
+        verified_positions.add(position)
+    return block, True, verified_positions
+
+
+def _iter_verified_blocks(path, workers, window):
+    """
+    파일의 블록을 순서대로 (줄 번호, block, 사전검사 통과 여부, 서명 검증한 위치 집합)으로 내보냅니다.
+    디코딩/서명 검사는 작업 프로세스들이 최대 window개 블록만큼 앞서서 병렬 수행합니다.
+    """
+    with _open_chain_file(path, "r") as f:
+        lines = ((line_number, line) for line_number, line in enumerate(f, 1) if line.strip())
+        if workers <= 1:
+            for line_number, line in lines:
+                yield (line_number,) + _decode_and_verify(line)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = deque()
+            for line_number, line in lines:
+                in_flight.append((line_number, executor.submit(_decode_and_verify, line)))
+                if len(in_flight) >= window:
+                    line_number, future = in_flight.popleft()
+                    yield (line_number,) + future.result()
+            while in_flight:
+                line_number, future = in_flight.popleft()
+                yield (line_number,) + future.result()
+
+
+def import_chain(path, blockchain, workers=None, window=None):
+    """
+    파일에서 체인을 가져와 blockchain의 체인과 UTXO 풀을 교체합니다 (새 노드 부트스트랩용).
+    블록 디코딩과 서명 검사는 병렬로 앞서 진행하고, UTXO 적용은 블록 순서대로 수행합니다.
+    블록들은 새 Blockchain에 먼저 쌓고 파일 전체가 검증된 뒤에만 교체하므로,
+    실패하면 blockchain은 그대로 남습니다. 성공하면 가져온 블록 수를, 실패하면 None을 반환합니다.
+    """
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    window = window if window is not None else workers * 4
+
+    staging = None # 가져오는 중인 체인 (검증이 끝나기 전에는 blockchain을 건드리지 않음)
+    for line_number, block, prechecked, verified_positions in _iter_verified_blocks(path, workers, window):
+        if block is None:
+            print(f"Node {blockchain.node_id}: 가져오기 오류 - {path} {line_number}번째 줄을 블록으로 읽을 수 없음.")
+            return None
+
+        if staging is None:
+            # 파일의 첫 블록을 제네시스 블록으로 사용 (UTXO 변경 없음)
+            if block.index != 0 or block.transactions:
+                print(f"Node {blockchain.node_id}: 가져오기 오류 - 첫 블록({line_number}번째 줄)이 제네시스 블록이 아님.")
+                return None
+            staging = Blockchain(blockchain.node_id, blockchain.difficulty, prune_depth=blockchain.prune_depth)
+            staging.reset_chain(block)
+            continue
+
+        if not prechecked:
+            print(f"Node {blockchain.node_id}: 가져오기 오류 - 블록 #{block.index}({line_number}번째 줄)의 해시 또는 서명이 유효하지 않음.")
+            return None
+        if not staging.add_block(block, verified_positions): # 작업 프로세스가 검증한 서명만 건너뜀
+            print(f"Node {blockchain.node_id}: 가져오기 오류 - 블록 #{block.index}({line_number}번째 줄) 연결 실패.")
+            return None
+
+    if staging is None:
+        print(f"Node {blockchain.node_id}: 가져오기 오류 - {path}에 블록이 없음.")
+        return None
+    blockchain.load_chain(staging.chain, staging.UTXOs, staging.pruned_height)
+    count = len(staging.chain)
+    print(f"Node {blockchain.node_id}: {path}에서 블록 {count}개를 가져옴.")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="블록체인 파일 내보내기/가져오기 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    mine_parser = subparsers.add_parser("mine", help="새 노드로 블록을 채굴한 뒤 체인을 파일로 내보냄")
+    mine_parser.add_argument("output", help="저장할 체인 파일 (.gz이면 압축)")
+    mine_parser.add_argument("--blocks", type=int, default=5, help="채굴할 블록 수")
+    mine_parser.add_argument("--difficulty", type=int, default=INITIAL_DIFFICULTY)
+
+    import_parser = subparsers.add_parser("import", help="체인 파일을 검증하며 가져옴")
+    import_parser.add_argument("input", help="가져올 체인 파일 (.gz이면 압축)")
+    import_parser.add_argument("--difficulty", type=int, default=INITIAL_DIFFICULTY)
+    import_parser.add_argument("--workers", type=int, default=None, help="디코딩/서명 검사 작업 프로세스 수 (기본: CPU 수)")
+    import_parser.add_argument("--export", dest="export_path", default=None, help="가져온 체인을 다시 저장할 파일")
+    import_parser.add_argument("--prune-depth", type=int, default=None, help="이 깊이보다 오래된 블록의 본문을 버림 (가지치기 모드)")
+
+    args = parser.parse_args()
+    if args.command == "import" and args.prune_depth is not None and args.prune_depth < 1:
+        import_parser.error(f"--prune-depth는 1 이상이어야 합니다: {args.prune_depth}")
+    if args.command == "import" and args.export_path and args.prune_depth is not None:
+        import_parser.error("--export는 --prune-depth와 함께 쓸 수 없습니다 (가지치기된 체인은 내보낼 수 없음)")
+
+    if args.command == "mine":
+        node = NetworkNode("Exporter", difficulty=args.difficulty)
+        for _ in range(args.blocks):
+            node.mine_new_block()
+        if export_chain(node.blockchain, args.output) is None:
+            raise SystemExit(1)
+    else:
+        blockchain = Blockchain("Importer", args.difficulty, prune_depth=args.prune_depth)
+        if import_chain(args.input, blockchain, workers=args.workers) is None:
+            raise SystemExit(1)
+        blockchain.print_chain_summary()
+        if args.export_path and export_chain(blockchain, args.export_path) is None:
+            raise SystemExit(1)
@@ -1,3 +1,4 @@
 
 INITIAL_DIFFICULTY = 4
 MINING_REWARD = 10
+KEY_CACHE_SIZE = 1024 # 공개키 -> VerifyingKey 캐시 최대 항목 수
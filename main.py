@@ -1,10 +1,12 @@
+import argparse
 import time
 from NetworkNode import NetworkNode
+from Simulation import Simulation, TOPOLOGIES, LATENCY_MODELS
 
 
 
-# --- 시뮬레이션 실행 ---
-if __name__ == "__main__":
+def run_scenario():
+    """노드 3개로 고정된 트랜잭션/채굴 시나리오를 실행합니다."""
     # 1. 네트워크 노드 생성
     node1 = NetworkNode("Node1", difficulty=4) # 채굴 노드
     node2 = NetworkNode("Node2", difficulty=4) # 다른 노드
@@ -27,7 +29,7 @@ if __name__ == "__main__":
 
     # 4. Node1이 첫 번째 블록 채굴 (멤풀 비어있음, 코인베이스 트랜잭션만 포함)
     print("\n[라운드 1] Node1이 첫 블록(코인베이스) 채굴 시도...")
-    initial_block = node1.mine_new_block()
+    node1.mine_new_block()
     time.sleep(0.1) # 전파 시간 약간 주기
 
     # 5. 다른 노드들이 체인 동기화 (resolve_conflicts 호출)
@@ -44,7 +46,7 @@ if __name__ == "__main__":
     # 아직 Node2는 코인이 없음. Node1만 코인베이스로 10코인 가짐.
     # Node1이 Node2에게 보내는 트랜잭션을 먼저 만들어야 함.
     print(f"\n[라운드 2.1] Node1 (잔액: {node1.blockchain.get_balance(node1.wallet.address)})이 Node2에게 7 코인 전송 시도...")
-    tx1 = node1.create_transaction(node2.wallet.address, 7)
+    node1.create_transaction(node2.wallet.address, 7)
     time.sleep(0.1)
 
     # print(f"Node1 멤풀: {node1.mempool}")
@@ -54,7 +56,7 @@ if __name__ == "__main__":
 
     # 7. Node3가 다음 블록 채굴 (Node1이 만든 트랜잭션 포함)
     print(f"\n[라운드 2.2] Node3 (멤풀 크기: {len(node3.mempool)})이 다음 블록 채굴 시도...")
-    block_by_node3 = node3.mine_new_block()
+    node3.mine_new_block()
     time.sleep(0.1)
 
     print("\n[라운드 2.3] 체인 동기화...")
@@ -69,13 +71,13 @@ if __name__ == "__main__":
 
     # 8. 이제 Node2가 Node1에게 코인 전송
     print(f"\n[라운드 3] Node2 (잔액: {node2.blockchain.get_balance(node2.wallet.address)})가 Node1에게 2 코인 전송 시도...")
-    tx2 = node2.create_transaction(node1.wallet.address, 2)
+    node2.create_transaction(node1.wallet.address, 2)
     time.sleep(0.1)
 
 
     # 9. Node1이 다음 블록 채굴 (Node2가 만든 트랜잭션 포함)
     print(f"\n[라운드 3.1] Node1 (멤풀 크기: {len(node1.mempool)})이 다음 블록 채굴 시도...")
-    block_by_node1_again = node1.mine_new_block()
+    node1.mine_new_block()
     time.sleep(0.1)
 
     print("\n[라운드 3.2] 체인 동기화...")
@@ -94,4 +96,66 @@ if __name__ == "__main__":
 
     print("\n--- 전체 체인 유효성 검사 ---")
     # 대표로 node1의 체인만 검증 (동기화 후에는 동일해야 함)
-    node1.blockchain.is_chain_valid()
\ No newline at end of file
+    node1.blockchain.is_chain_valid()
+
+
+def parse_hash_rates(value):
+    """--hash-rates 인자(쉼표로 구분한 양수 목록)를 파싱합니다."""
+    try:
+        hash_rates = [float(rate) for rate in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"숫자 목록이 아닙니다: {value}")
+    if any(rate <= 0 for rate in hash_rates):
+        raise argparse.ArgumentTypeError(f"해시 파워는 모두 0보다 커야 합니다: {value}")
+    return hash_rates
+
+
+def run_simulation(args):
+    """이산 사건 기반 다중 노드 시뮬레이션을 실행하고 포크 비율/전파 지연을 출력합니다."""
+    simulation = Simulation(
+        node_count=args.nodes,
+        topology=args.topology,
+        degree=args.degree,
+        rewire_prob=args.rewire_prob,
+        latency_model=args.latency_model,
+        mean_latency=args.latency,
+        miner_count=args.miners,
+        hash_rates=args.hash_rates,
+        block_interval=args.block_interval,
+        difficulty=args.difficulty,
+        prune_depth=args.prune_depth,
+        seed=args.seed,
+        verbose=args.verbose,
+    )
+    print(f"\n--- 시뮬레이션 시작 (노드 {args.nodes}개, 토폴로지 {args.topology}, 채굴자 {len(simulation.miners)}명) ---")
+    Simulation.print_summary(simulation.run(args.blocks))
+
+
+# --- 시뮬레이션 실행 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="블록체인 P2P 시뮬레이션")
+    parser.add_argument("--simulate", action="store_true", help="고정 시나리오 대신 다중 노드 이산 사건 시뮬레이션 실행")
+    parser.add_argument("--nodes", type=int, default=100, help="노드 수")
+    parser.add_argument("--topology", choices=TOPOLOGIES, default="random", help="네트워크 토폴로지")
+    parser.add_argument("--degree", type=int, default=8, help="노드당 평균 이웃 수")
+    parser.add_argument("--rewire-prob", type=float, default=0.1, help="small-world 토폴로지의 재배선 확률")
+    parser.add_argument("--latency-model", choices=LATENCY_MODELS, default="exponential", help="블록 전파 지연 분포")
+    parser.add_argument("--latency", type=float, default=0.5, help="링크당 평균 전파 지연 (초)")
+    parser.add_argument("--miners", type=int, default=10, help="채굴자 수 (해시 파워 동일)")
+    parser.add_argument("--hash-rates", type=parse_hash_rates, default=None, help="채굴자별 상대 해시 파워 (예: 30,20,10). 지정하면 --miners 무시")
+    parser.add_argument("--block-interval", type=float, default=10.0, help="평균 블록 간격 (초)")
+    parser.add_argument("--blocks", type=int, default=100, help="채굴할 블록 수")
+    parser.add_argument("--difficulty", type=int, default=1, help="시뮬레이션 블록의 실제 PoW 난이도")
+    parser.add_argument("--prune-depth", type=int, default=None, help="노드들이 이 깊이보다 오래된 블록의 본문을 버림 (가지치기 모드)")
+    parser.add_argument("--seed", type=int, default=None, help="난수 시드")
+    parser.add_argument("--verbose", action="store_true", help="노드별 상세 로그 출력")
+    args = parser.parse_args()
+    if args.prune_depth is not None and args.prune_depth < 1:
+        parser.error(f"--prune-depth는 1 이상이어야 합니다: {args.prune_depth}")
+    if args.hash_rates is not None and len(args.hash_rates) > args.nodes:
+        parser.error(f"--hash-rates 항목 수({len(args.hash_rates)})가 --nodes({args.nodes})보다 많습니다.")
+
+    if args.simulate:
+        run_simulation(args)
+    else:
+        run_scenario()